@@ -1,9 +1,47 @@
+import heapq
+import numpy as np
 import pandas as pd
-import csv
 import matplotlib.pyplot as plt
 from math import pi
 
 
+def read_last_line(file, block_size: int = 4096) -> str:
+    """
+    Read the last non-empty line of a text file without loading the whole file.
+
+    The file must be a real file opened in text mode: the helper reads its
+    underlying binary buffer, so in-memory streams such as io.StringIO are not
+    supported. The text stream is left positioned at the end of the file.
+
+    Args:
+        file (file): Text file object opened for reading.
+        block_size (int): Number of bytes read per step from the end of the file.
+
+    Returns:
+        str: Last line of the file, without the trailing newline, or an empty
+             string if the file is empty.
+    """
+    file.seek(0, 2)
+    raw = file.buffer
+    position = raw.seek(0, 2)
+    data = b''
+
+    # Read backwards until the buffer holds a full line
+    while position > 0:
+        step = min(block_size, position)
+        position -= step
+        raw.seek(position)
+        data = raw.read(step) + data
+        if b'\n' in data.rstrip(b'\r\n'):
+            break
+
+    # Resynchronise the text wrapper with the raw buffer
+    file.seek(0, 2)
+
+    data = data.rstrip(b'\r\n')
+    return data[data.rfind(b'\n') + 1:].decode(file.encoding)
+
+
 def build_radar_dict(best_teams_file, pokemons_file):
     """
     Build a dictionary of Pokémon stats for the best team found by the algorithm.
@@ -16,34 +54,26 @@ def build_radar_dict(best_teams_file, pokemons_file):
         dict: Dictionary mapping Pokémon names to their stats 
               [Attack, Defense, HP, Speed, Sp. Defense, Sp. Attack].
     """
-    lines = best_teams_file.readlines()
-    last_line = lines[-1].strip()
+    last_line = read_last_line(best_teams_file).strip()
     pokemon_names = last_line.split(',')[4:]  # Pokémon names start from 5th column
 
-    pokemon_stats = {}
-
-    reader = csv.DictReader(pokemons_file)
-    for row in reader:
-        name = row['name']
-        if name in pokemon_names:
-            attack = int(row['attack'])
-            defense = int(row['defense'])
-            hp = int(row['hp'])
-            speed = int(row['speed'])
-            sp_defense = int(row['sp_defense'])
-            sp_attack = int(row['sp_attack'])
+    stat_columns = ['attack', 'defense', 'hp', 'speed', 'sp_defense', 'sp_attack']
+    df = pd.read_csv(pokemons_file)
+    selected = df.loc[df['name'].isin(set(pokemon_names)), ['name'] + stat_columns]
 
-            pokemon_stats[name] = [attack, defense, hp, speed, sp_defense, sp_attack]
+    stats = selected[stat_columns].astype(np.int32).to_numpy()
+    pokemon_stats = dict(zip(selected['name'].to_numpy(), stats.tolist()))
 
     return pokemon_stats
 
 
-def radar_chart(best_team_stats: dict):
+def radar_chart(best_team_stats: dict, ax=None):
     """
     Generate a radar chart showing stats of the best team found.
 
     Args:
         best_team_stats (dict): Dictionary with Pokémon names as keys and their stats as values.
+        ax (PolarAxes, optional): Polar axes to draw on. A new figure is shown if omitted.
     """
     categories = ['Attack', 'Defense', 'HP', 'Speed', 'Sp. Defense', 'Sp. Attack']
     num_vars = len(categories)
@@ -53,7 +83,9 @@ def radar_chart(best_team_stats: dict):
     angles += angles[:1]
 
     # Initialize figure
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
 
     # Plot each Pokémon
     for pokemon, values in best_team_stats.items():
@@ -62,39 +94,49 @@ def radar_chart(best_team_stats: dict):
         ax.fill(angles, values, alpha=0.25)
 
     # Labels
-    plt.xticks(angles[:-1], categories)
-    plt.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
-    plt.title('Best Team Stats')
-    plt.show()
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories)
+    ax.legend(loc='upper right', bbox_to_anchor=(0.1, 0.1))
+    ax.set_title('Best Team Stats')
+    if show:
+        plt.show()
 
 
-def plot_fitness_evolution():
+def plot_fitness_evolution(ax=None):
     """
     Plot the fitness of the best team across generations (epochs).
+
+    Args:
+        ax (Axes, optional): Axes to draw on. A new figure is shown if omitted.
     """
     df = pd.read_csv('mejores.csv')
     fitness = df['aptitud']
     epochs = range(1, len(df) + 1)
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(epochs, fitness, marker='o', linestyle='-', color='b', label='Fitness')
-    plt.xlabel('Epoch')
-    plt.ylabel('Fitness')
-    plt.title('Best Team Fitness Over Generations')
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
-
-
-def bar_chart(epochs_file):
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(epochs, fitness, marker='o', linestyle='-', color='b', label='Fitness')
+    ax.set_xlabel('Epoch')
+    ax.set_ylabel('Fitness')
+    ax.set_title('Best Team Fitness Over Generations')
+    ax.grid(True)
+    ax.legend()
+    if show:
+        fig.tight_layout()
+        plt.show()
+
+
+def bar_chart(epochs_file, top_n: int = 30, ax=None):
     """
-    Plot a horizontal bar chart showing Pokémon frequencies in the last recorded epoch.
+    Plot a horizontal bar chart showing the most frequent Pokémon in the last recorded epoch.
 
     Args:
         epochs_file (file): File object with epoch data.
+        top_n (int): Maximum number of Pokémon to show.
+        ax (Axes, optional): Axes to draw on. A new figure is shown if omitted.
     """
-    last_line = list(epochs_file)[-1].strip()
+    last_line = read_last_line(epochs_file).strip()
     data = last_line.split(', ')
 
     pokemon_names = []
@@ -106,20 +148,22 @@ def bar_chart(epochs_file):
         pokemon_names.append(name)
         quantities.append(count)
 
-    # Sort by frequency (descending)
-    stats = list(zip(pokemon_names, quantities))
-    stats.sort(key=lambda x: x[1], reverse=True)
+    # Keep only the most frequent Pokémon, in descending order
+    stats = heapq.nlargest(top_n, zip(pokemon_names, quantities), key=lambda x: x[1])
 
     sorted_names = [x[0] for x in stats]
     sorted_counts = [x[1] for x in stats]
 
-    plt.figure(figsize=(12, 6))
-    plt.barh(sorted_names, sorted_counts, color='skyblue')
-    plt.xlabel('Count')
-    plt.ylabel('Pokémon')
-    plt.title('Pokémon Frequency in Last Epoch')
-    plt.gca().invert_yaxis()
-    plt.show()
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(12, 6))
+    ax.barh(sorted_names, sorted_counts, color='skyblue')
+    ax.set_xlabel('Count')
+    ax.set_ylabel('Pokémon')
+    ax.set_title('Pokémon Frequency in Last Epoch')
+    ax.invert_yaxis()
+    if show:
+        plt.show()
 
 
 def process_pokemon_data(epochs_file, pokemons_file):
@@ -133,49 +177,48 @@ def process_pokemon_data(epochs_file, pokemons_file):
     Returns:
         dict: Dictionary where keys are Pokémon types and values are counts.
     """
-    epochs_file.seek(0)
-    lines = epochs_file.readlines()
-    last_line = lines[-1].strip()
+    last_line = read_last_line(epochs_file).strip()
 
     elements = last_line.split(', ')
     names = elements[2::2]
     quantities = elements[3::2]
-
-    type_counts = {}
+    qty_map = {name: int(qty) for name, qty in zip(names, quantities)}
 
     pokemons_file.seek(0)
-    reader = csv.DictReader(pokemons_file)
+    df = pd.read_csv(pokemons_file)
+    df = df[df['name'].isin(qty_map.keys())]
+    df = df.assign(qty=df['name'].map(qty_map))
 
-    for row in reader:
-        if row['name'] in names:
-            count = int(quantities[names.index(row['name'])])
-            types = [row['type1']]
-            if row['type2']:
-                types.append(row['type2'])
-            for t in types:
-                type_counts[t] = type_counts.get(t, 0) + count
+    # groupby skips Pokémon without a second type (NaN type2)
+    type1_counts = df.groupby('type1')['qty'].sum()
+    type2_counts = df.groupby('type2')['qty'].sum()
+    type_counts = type1_counts.add(type2_counts, fill_value=0).astype(int).to_dict()
 
     return type_counts
 
 
-def plot_type_distribution(type_dict: dict):
+def plot_type_distribution(type_dict: dict, ax=None):
     """
     Plot the type distribution of the Pokémon team from the last epoch.
 
     Args:
         type_dict (dict): Dictionary with Pokémon types and counts.
+        ax (Axes, optional): Axes to draw on. A new figure is shown if omitted.
     """
     types = list(map(str, type_dict.keys()))
     counts = list(type_dict.values())
 
-    plt.figure(figsize=(10, 6))
-    plt.bar(types, counts, color='skyblue')
-    plt.xlabel('Pokémon Types')
-    plt.ylabel('Count')
-    plt.title('Pokémon Type Distribution in Last Epoch')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(types, counts, color='skyblue')
+    ax.set_xlabel('Pokémon Types')
+    ax.set_ylabel('Count')
+    ax.set_title('Pokémon Type Distribution in Last Epoch')
+    ax.tick_params(axis='x', labelrotation=45)
+    if show:
+        fig.tight_layout()
+        plt.show()
 
 
 def main():
@@ -187,12 +230,22 @@ def main():
     best_teams_file = open(best_teams_file_path, 'r')
     pokemons_file = open(pokemons_file_path, 'r')
 
+    # Draw all four charts on a single figure
+    fig = plt.figure(figsize=(14, 12))
+    radar_ax = fig.add_subplot(2, 2, 1, polar=True)
+    bar_ax = fig.add_subplot(2, 2, 2)
+    fitness_ax = fig.add_subplot(2, 2, 3)
+    types_ax = fig.add_subplot(2, 2, 4)
+
     radar_dict = build_radar_dict(best_teams_file, pokemons_file)
-    radar_chart(radar_dict)
-    bar_chart(epochs_file)
-    plot_fitness_evolution()
+    radar_chart(radar_dict, ax=radar_ax)
+    bar_chart(epochs_file, ax=bar_ax)
+    plot_fitness_evolution(ax=fitness_ax)
     type_counts = process_pokemon_data(epochs_file, pokemons_file)
-    plot_type_distribution(type_counts)
+    plot_type_distribution(type_counts, ax=types_ax)
+
+    fig.tight_layout()
+    plt.show()
 
     epochs_file.close()
     best_teams_file.close()
@@ -1,3 +1,4 @@
+from typing import TYPE_CHECKING
 import pandas as pd
 from team import Team
 from pokemon import Pokemon
@@ -5,6 +6,9 @@ from move import Move
 from combat import __faint_change__, get_winner
 from proceso import obtener_equipo
 
+if TYPE_CHECKING:
+    from process import Effectiveness
+
 
 def build_koga_team():
     """
@@ -15,6 +19,7 @@ def build_koga_team():
     """
     pokemon_data = pd.read_csv("pokemons.csv")
     moves_data = pd.read_csv("moves.csv")
+    moves_by_name = moves_data.drop_duplicates('name').set_index('name', drop=False)
 
     koga_pokemons = ['Skunktank', 'Toxicroak', 'Swalot', 'Venomoth', 'Muk', 'Crobat']
 
@@ -26,7 +31,7 @@ def build_koga_team():
         moves = []
         if not pd.isna(row['moves']):
             for move_name in row['moves'].split(";"):
-                move_row = moves_data.loc[moves_data["name"] == move_name].iloc[0]
+                move_row = moves_by_name.loc[move_name]
                 moves.append(
                     Move(
                         move_row["name"],
@@ -73,33 +78,59 @@ def get_next_active_pokemon(team: Team):
     return None
 
 
-def battle(team1: Team, team2: Team, effectiveness: dict):
+def count_alive(team: Team) -> None:
+    """Recompute the team's alive count from its Pokémon's current HP."""
+    team.alive_count = sum(p.current_hp > 0 for p in team.pokemons)
+
+
+def apply_damage(team: Team, pokemon, damage) -> None:
+    """Subtract damage from a Pokémon and update the team's alive count if it faints."""
+    was_alive = pokemon.current_hp > 0
+    pokemon.current_hp -= damage
+    if was_alive and pokemon.current_hp <= 0:
+        team.alive_count -= 1
+
+
+def battle(team1: Team, team2: Team, effectiveness: "Effectiveness", verbose: bool = True):
     """
     Simulates a battle between two Pokémon teams.
 
     Args:
         team1 (Team): The first team of 6 Pokémon.
         team2 (Team): The second team of 6 Pokémon.
-        effectiveness (dict): Dictionary with type effectiveness multipliers.
+        effectiveness (Effectiveness): Type effectiveness chart, indexed as
+            effectiveness[attacking_type][defending_type].
+        verbose (bool): Whether to print the turn-by-turn log of the battle.
 
     Returns:
-        None
+        Team: The winning team.
     """
     turn = 0
-    print(f"{team1.name} vs {team2.name}")
+    if verbose:
+        print(f"{team1.name} vs {team2.name}")
+
+    # Track living Pokémon per team instead of rescanning both teams every turn.
+    # The counts are refreshed after external calls that may change HP.
+    count_alive(team1)
+    count_alive(team2)
 
-    while any(p.current_hp > 0 for p in team1.pokemons) and any(p.current_hp > 0 for p in team2.pokemons):
-        print(f"Turn {turn + 1}:")
+    while team1.alive_count > 0 and team2.alive_count > 0:
+        if verbose:
+            print(f"Turn {turn + 1}:")
         team1_pokemon = team1.get_current_pokemon()
         team2_pokemon = team2.get_current_pokemon()
 
-        print(f"{team1.name}'s {team1_pokemon.name} vs {team2.name}'s {team2_pokemon.name}\n")
+        if verbose:
+            print(f"{team1.name}'s {team1_pokemon.name} vs {team2.name}'s {team2_pokemon.name}\n")
 
         # Handle fainted Pokémon
         if team1_pokemon.current_hp <= 0 or team2_pokemon.current_hp <= 0:
             __faint_change__(team1, team2, effectiveness)
-            print(f"{team1.name} fainted count: {sum(p.current_hp <= 0 for p in team1.pokemons)}")
-            print(f"{team2.name} fainted count: {sum(p.current_hp <= 0 for p in team2.pokemons)}\n")
+            count_alive(team1)
+            count_alive(team2)
+            if verbose:
+                print(f"{team1.name} fainted count: {len(team1.pokemons) - team1.alive_count}")
+                print(f"{team2.name} fainted count: {len(team2.pokemons) - team2.alive_count}\n")
             continue
 
         # Get next actions
@@ -108,37 +139,52 @@ def battle(team1: Team, team2: Team, effectiveness: dict):
 
         # Team 1 action
         if action1 == 'switch':
-            print(f"{team1.name} switches {team1_pokemon.name}\n")
+            if verbose:
+                print(f"{team1.name} switches {team1_pokemon.name}\n")
             team1.do_action(action1, target1, team2, effectiveness)
+            count_alive(team1)
+            count_alive(team2)
         elif action1 == 'attack':
             move, damage = team1_pokemon.get_best_attack(team2_pokemon, effectiveness)
-            print(f"{team1.name}'s {team1_pokemon.name} uses {move.name}, dealing {damage} damage\n")
-            team2_pokemon.current_hp -= damage
+            if verbose:
+                print(f"{team1.name}'s {team1_pokemon.name} uses {move.name}, dealing {damage} damage\n")
+            apply_damage(team2, team2_pokemon, damage)
 
         # Team 2 action
         if action2 == 'switch':
-            print(f"{team2.name} switches {team2_pokemon.name}\n")
+            if verbose:
+                print(f"{team2.name} switches {team2_pokemon.name}\n")
             team2.do_action(action2, target2, team1, effectiveness)
+            count_alive(team1)
+            count_alive(team2)
         elif action2 == 'attack':
             move, damage = team2_pokemon.get_best_attack(team1_pokemon, effectiveness)
-            print(f"{team2.name}'s {team2_pokemon.name} uses {move.name}, dealing {damage} damage\n")
-            team1_pokemon.current_hp -= damage
+            if verbose:
+                print(f"{team2.name}'s {team2_pokemon.name} uses {move.name}, dealing {damage} damage\n")
+            apply_damage(team1, team1_pokemon, damage)
 
         # Print current HP
-        print(f"{team1_pokemon.name} HP: {team1_pokemon.current_hp}\n")
-        print(f"{team2_pokemon.name} HP: {team2_pokemon.current_hp}\n")
+        if verbose:
+            print(f"{team1_pokemon.name} HP: {team1_pokemon.current_hp}\n")
+            print(f"{team2_pokemon.name} HP: {team2_pokemon.current_hp}\n")
 
         # Handle faint after damage
         if team1_pokemon.current_hp <= 0 or team2_pokemon.current_hp <= 0:
             __faint_change__(team1, team2, effectiveness)
-            print(f"{team1.name} fainted count: {sum(p.current_hp <= 0 for p in team1.pokemons)}")
-            print(f"{team2.name} fainted count: {sum(p.current_hp <= 0 for p in team2.pokemons)}\n")
+            count_alive(team1)
+            count_alive(team2)
+            if verbose:
+                print(f"{team1.name} fainted count: {len(team1.pokemons) - team1.alive_count}")
+                print(f"{team2.name} fainted count: {len(team2.pokemons) - team2.alive_count}\n")
 
         turn += 1
 
     # Determine winner
     winner = get_winner(team1, team2, effectiveness)
-    print(f"The winner is {winner.name}")
+    if verbose:
+        print(f"The winner is {winner.name}")
+
+    return winner
 
 
 def main():
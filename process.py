@@ -1,10 +1,15 @@
 from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
 import pandas as pd
 from team import Team
 from pokemon import Pokemon
 from move import Move
 from combat import __fight__, get_winner
+import os
 import random
+import copy
 import csv
 
 
@@ -12,19 +17,45 @@ import csv
 epochs_file_path = 'epochs.csv'
 best_teams_file_path = 'mejores.csv'
 
-# Create output CSVs and write headers
-epochs_file = open(epochs_file_path, 'w', newline='')
-best_teams_file = open(best_teams_file_path, 'w', newline='')
-best_teams_file.write(
-    'epoch,fitness,team_name,starter,pokemon_1,pokemon_2,pokemon_3,pokemon_4,pokemon_5,pokemon_6\n'
-)
-
 # Load input datasets
 pokemon_data = pd.read_csv("pokemons.csv")
 moves_data = pd.read_csv("moves.csv")
 
 # Filter out legendary Pokémon
 non_legendary_pokemon = pokemon_data[pokemon_data['is_legendary'] == 0]
+non_legendary_pokemon = non_legendary_pokemon.assign(
+    type2=non_legendary_pokemon['type2'].fillna(""),
+    moves=non_legendary_pokemon['moves'].fillna("")
+)
+
+# Build every Move once so Pokémon can share them instead of rescanning moves_data
+MOVE_CACHE = {
+    row['name']: Move(row['name'], row['type'], row['category'], row['pp'], row['power'], row['accuracy'])
+    for _, row in moves_data.drop_duplicates('name').iterrows()
+}
+
+
+def build_pokemon(row) -> Pokemon:
+    """
+    Build a Pokemon object from a row of pokemons.csv.
+
+    Args:
+        row (pd.Series): Row with the Pokémon's data.
+
+    Returns:
+        Pokemon: Pokemon object with its moves taken from MOVE_CACHE.
+    """
+    moves = [MOVE_CACHE[m] for m in row['moves'].split(";")] if row['moves'] else []
+
+    return Pokemon(
+        row['pokedex_number'], row['name'], row['type1'], row['type2'], row['hp'],
+        row['attack'], row['defense'], row['sp_attack'], row['sp_defense'], row['speed'],
+        row['generation'], row['height_m'], row['weight_kg'], row['is_legendary'], moves
+    )
+
+
+# Build every non-legendary Pokémon once; teams receive copies of these templates
+POKEMON_TEMPLATES = [build_pokemon(row) for _, row in non_legendary_pokemon.iterrows()]
 
 
 def get_random_pokemon_list(count: int) -> list:
@@ -37,28 +68,9 @@ def get_random_pokemon_list(count: int) -> list:
     Returns:
         list: List of Pokemon objects ready to be used in teams.
     """
-    selected = non_legendary_pokemon.sample(n=count, replace=False)
-    pokemon_list = []
-
-    for _, row in selected.iterrows():
-        moves = []
-        if row['moves'] == row['moves']:  # Check for NaN
-            for m in row['moves'].split(";"):
-                o = moves_data.loc[moves_data["name"] == m].iloc[0]
-                moves.append(
-                    Move(o["name"], o["type"], o["category"], o["pp"], o["power"], o["accuracy"])
-                )
-        if row['type2'] != row['type2']:  # Handle NaN in type2
-            row['type2'] = ""
-
-        poke = Pokemon(
-            row['pokedex_number'], row['name'], row['type1'], row['type2'], row['hp'],
-            row['attack'], row['defense'], row['sp_attack'], row['sp_defense'], row['speed'],
-            row['generation'], row['height_m'], row['weight_kg'], row['is_legendary'], moves
-        )
-        pokemon_list.append(poke)
-
-    return pokemon_list
+    # Templates never battle, so deep copies start at full HP and share no state
+    # (moves, PP or anything else Pokemon holds) with the templates or other teams
+    return [copy.deepcopy(template) for template in random.sample(POKEMON_TEMPLATES, count)]
 
 
 def initialize_population(size: int, tag: str) -> list:
@@ -80,64 +92,99 @@ def initialize_population(size: int, tag: str) -> list:
     return teams
 
 
-def load_effectiveness_chart(filepath: str) -> dict:
+class Effectiveness(dict):
     """
-    Load type effectiveness chart into a dictionary.
+    Type effectiveness chart as a nested dictionary {attacking_type: {defending_type: multiplier}}.
+
+    The nested dictionaries are built once from a float32 matrix whose rows are
+    attacking types and whose columns are defending types. The matrix is kept
+    with both index maps, so matrix[attack_to_idx[att], defense_to_idx[def]]
+    matches effectiveness[att][def].
+    """
+
+    def __init__(self, matrix: np.ndarray, attack_to_idx: dict, defense_to_idx: dict):
+        defense_types = list(defense_to_idx)
+        super().__init__(
+            (attack_type, dict(zip(defense_types, row.tolist())))
+            for attack_type, row in zip(attack_to_idx, matrix)
+        )
+        self.matrix = matrix
+        self.attack_to_idx = attack_to_idx
+        self.defense_to_idx = defense_to_idx
+
+
+def load_effectiveness_chart(filepath: str) -> Effectiveness:
+    """
+    Load type effectiveness chart into a matrix-backed Effectiveness chart.
 
     Args:
         filepath (str): Path to effectiveness_chart.csv.
 
     Returns:
-        dict: Nested dictionary {attacking_type: {defending_type: multiplier}}.
+        Effectiveness: Chart indexable as {attacking_type: {defending_type: multiplier}}.
     """
-    with open(filepath, 'r') as file:
-        lines = file.readlines()
+    df = pd.read_csv(filepath, index_col=0)
+    matrix = df.to_numpy(dtype=np.float32)
+    attack_to_idx = {t: i for i, t in enumerate(df.index)}
+    defense_to_idx = {t: i for i, t in enumerate(df.columns)}
+
+    return Effectiveness(matrix, attack_to_idx, defense_to_idx)
 
-    effectiveness = {}
-    types = lines[0].strip().split(',')[1:]
 
-    for line in lines[1:]:
-        row = line.strip().split(',')
-        attack_type = row[0]
-        effectiveness[attack_type] = {}
-        for idx, value in enumerate(row[1:]):
-            defense_type = types[idx]
-            effectiveness[attack_type][defense_type] = float(value)
+def count_wins(team: Team, opponents: list, effectiveness: Effectiveness) -> int:
+    """
+    Count how many opponents a team defeats.
 
-    return effectiveness
+    The team and the opponents are deep-copied first, so every team fights
+    fresh opponents no matter how the worker pool batched the tasks. Pokémon
+    shared between teams (crossover reuses parent Pokémon) stay independent too.
 
+    Args:
+        team (Team): Team to evaluate.
+        opponents (list): Opponent teams to battle against.
+        effectiveness (Effectiveness): Type effectiveness chart.
 
-def evaluate_fitness(opponents_count: int, teams: list, effectiveness: dict) -> tuple:
+    Returns:
+        int: Number of battles won by the team.
+    """
+    team, opponents = copy.deepcopy((team, opponents))
+    return sum(get_winner(team, opponent, effectiveness) == team for opponent in opponents)
+
+
+def evaluate_fitness(
+    opponents_count: int, teams: list, effectiveness: Effectiveness, executor: ProcessPoolExecutor
+) -> tuple:
     """
     Evaluate the fitness of each team by simulating battles.
 
+    Teams are evaluated in parallel worker processes, each battling its own
+    copy of the opponents (see count_wins).
+
     Args:
         opponents_count (int): Number of opponents per team.
         teams (list): Teams to evaluate.
-        effectiveness (dict): Type effectiveness chart.
+        effectiveness (Effectiveness): Type effectiveness chart.
+        executor (ProcessPoolExecutor): Worker pool shared across epochs.
 
     Returns:
         tuple: (Sorted list of best teams, list of (team_name, wins)).
     """
-    wins_per_team = [[team.name, 0] for team in teams]
     opponents = initialize_population(opponents_count, "E")
 
-    for idx, team in enumerate(teams):
-        for opponent in opponents:
-            result = get_winner(team, opponent, effectiveness)
-            if result == team:
-                wins_per_team[idx][1] += 1
+    # One chunk per worker, so the opponents are pickled once per chunk rather than per team;
+    # count_wins copies them per team, so results do not depend on how tasks are chunked
+    chunksize = max(1, -(-len(teams) // (os.cpu_count() or 1)))
+    results = executor.map(
+        count_wins, teams, repeat(opponents), repeat(effectiveness), chunksize=chunksize
+    )
+    wins_per_team = [[i, w] for i, w in enumerate(results)]
 
     sorted_results = sorted(wins_per_team, key=itemgetter(1), reverse=True)
 
-    best_teams = []
-    for name, _ in sorted_results:
-        for team in teams:
-            if team.name == name:
-                best_teams.append(team)
-                break
+    best_teams = [teams[i] for i, _ in sorted_results]
+    fitness_results = [(teams[i].name, wins) for i, wins in sorted_results]
 
-    return best_teams, sorted_results
+    return best_teams, fitness_results
 
 
 def crossover(teams: list, epoch: int) -> list:
@@ -152,32 +199,36 @@ def crossover(teams: list, epoch: int) -> list:
         list: List of offspring Team objects.
     """
     offspring = []
-    for iteration in range(50):
-        random_scores = [random.random() for _ in range(50)]
-        for i in range(20):
-            random_scores[i] *= 3
+    random_scores = np.random.random((50, 50))
+    random_scores[:, :20] *= 3
+
+    # kth=1 places each row's best and second-best team in columns 0 and 1
+    top_two = np.argpartition(-random_scores, 1, axis=1)[:, :2]
+    coin_flips = np.random.random((50, 6)) >= 0.5
 
-        team_indices = list(range(50))
-        ranked = sorted(zip(team_indices, random_scores), key=lambda x: x[1], reverse=True)
-        ranked_indices = [idx for idx, _ in ranked]
+    for iteration in range(50):
+        ranked_indices = top_two[iteration]
 
         pokes = []
+        seen = set()
         j = 0
         while j < 6:
-            if random.random() >= 0.5:
+            if coin_flips[iteration, j]:
                 source = ranked_indices[0]
                 candidate = teams[source].pokemons[j]
-                if any(p.name == candidate.name for p in pokes):
+                if candidate.name in seen:
                     source = ranked_indices[1]
                     candidate = teams[source].pokemons[j]
                 pokes.append(candidate)
+                seen.add(candidate.name)
             else:
                 source = ranked_indices[1]
                 candidate = teams[source].pokemons[j]
-                if any(p.name == candidate.name for p in pokes):
+                if candidate.name in seen:
                     source = ranked_indices[0]
                     candidate = teams[source].pokemons[j]
                 pokes.append(candidate)
+                seen.add(candidate.name)
             j += 1
 
         offspring.append(Team(f"Team {iteration}-{epoch}", pokes))
@@ -192,19 +243,23 @@ def mutation(teams: list):
     Args:
         teams (list): List of Team objects.
     """
-    for team in teams:
-        for i, pokemon in enumerate(team.pokemons):
-            if random.random() < 0.03:
-                team.pokemons[i] = get_random_pokemon_list(1)[0]
+    mask = np.random.random((len(teams), 6)) < 0.03
+    replacements = iter(get_random_pokemon_list(int(mask.sum())))
+
+    for team_idx, poke_idx in np.argwhere(mask):
+        teams[team_idx].pokemons[poke_idx] = next(replacements)
 
 
-def write_epochs_file(teams: list, epoch: int) -> None:
+def format_epoch_row(teams: list, epoch: int) -> str:
     """
-    Write epoch data to epochs.csv.
+    Build the epochs.csv row for an epoch.
 
     Args:
         teams (list): Teams in current epoch.
         epoch (int): Current epoch number.
+
+    Returns:
+        str: Row with the epoch, the number of distinct Pokémon and each Pokémon's count.
     """
     counts = {}
     for team in teams:
@@ -217,16 +272,19 @@ def write_epochs_file(teams: list, epoch: int) -> None:
     for name, qty in sorted_counts.items():
         line.append(f"{name}, {qty}")
 
-    epochs_file.write(", ".join(line) + "\n")
+    return ", ".join(line) + "\n"
 
 
-def write_best_team(best_teams: list, fitness_list: list) -> None:
+def format_best_team_row(best_teams: list, fitness_list: list) -> str:
     """
-    Write the best team of the epoch to mejores.csv.
+    Build the mejores.csv row for the best team of the epoch.
 
     Args:
         best_teams (list): Sorted list of best teams.
         fitness_list (list): List of (team_name, fitness).
+
+    Returns:
+        str: Row with the epoch, fitness, team name, starter and Pokémon names.
     """
     team = best_teams[0]
     parts = team.name.split('-')
@@ -239,7 +297,7 @@ def write_best_team(best_teams: list, fitness_list: list) -> None:
         str(0)
     ] + [poke.name for poke in team.pokemons]
 
-    best_teams_file.write(",".join(line) + "\n")
+    return ",".join(line) + "\n"
 
 
 def run_evolution():
@@ -247,7 +305,7 @@ def run_evolution():
     Run the evolutionary algorithm to optimize Pokémon teams.
 
     Returns:
-        tuple: (Best team for battle, effectiveness dictionary).
+        tuple: (Best team for battle, effectiveness chart).
     """
     initial_population = 50
     evaluation_opponents = 40
@@ -255,20 +313,33 @@ def run_evolution():
     effectiveness = load_effectiveness_chart("effectiveness_chart.csv")
     epochs = 5
 
-    for k in range(1, epochs + 1):
-        print(f"Epoch {k}")
-        teams, fitness_results = evaluate_fitness(evaluation_opponents, teams, effectiveness)
-        write_best_team(teams, fitness_results)
-        write_epochs_file(teams, k)
+    # Output rows are buffered and written once the run finishes
+    epoch_rows = []
+    best_team_rows = []
+
+    # A single pool for the whole run, so workers load the datasets only once
+    with ProcessPoolExecutor() as executor:
+        for k in range(1, epochs + 1):
+            print(f"Epoch {k}")
+            teams, fitness_results = evaluate_fitness(evaluation_opponents, teams, effectiveness, executor)
+            best_team_rows.append(format_best_team_row(teams, fitness_results))
+            epoch_rows.append(format_epoch_row(teams, k))
 
-        if k < epochs:
-            children = crossover(teams, k)
-            mutation(children)
-            teams = children
+            if k < epochs:
+                children = crossover(teams, k)
+                mutation(children)
+                teams = children
 
     battle_team = teams[0]
-    epochs_file.close()
-    best_teams_file.close()
+
+    with open(epochs_file_path, 'w', newline='') as epochs_file:
+        epochs_file.writelines(epoch_rows)
+
+    with open(best_teams_file_path, 'w', newline='') as best_teams_file:
+        best_teams_file.write(
+            'epoch,fitness,team_name,starter,pokemon_1,pokemon_2,pokemon_3,pokemon_4,pokemon_5,pokemon_6\n'
+        )
+        best_teams_file.writelines(best_team_rows)
 
     return battle_team, effectiveness
 
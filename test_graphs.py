@@ -0,0 +1,43 @@
+import pytest
+
+from graphs import read_last_line
+
+
+def write_and_open(tmp_path, content: bytes):
+    path = tmp_path / "data.csv"
+    path.write_bytes(content)
+    return open(path, 'r', encoding='utf-8')
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b"", ""),
+    (b"only line", "only line"),
+    (b"header\n1, Bulbasaur, 2\n", "1, Bulbasaur, 2"),
+    (b"header\n1, Bulbasaur, 2", "1, Bulbasaur, 2"),
+    (b"header\r\n1, Bulbasaur, 2\r\n", "1, Bulbasaur, 2"),
+    (b"header\n1, Bulbasaur, 2\n\n", "1, Bulbasaur, 2"),
+])
+def test_read_last_line(tmp_path, content, expected):
+    with write_and_open(tmp_path, content) as file:
+        assert read_last_line(file) == expected
+
+
+def test_read_last_line_spans_several_blocks(tmp_path):
+    last = "5, 12, " + ", ".join(f"Pokemon{i}, {i}" for i in range(50))
+    with write_and_open(tmp_path, f"header\n{last}\n".encode()) as file:
+        assert read_last_line(file, block_size=16) == last
+
+
+def test_read_last_line_decodes_multibyte_names_across_blocks(tmp_path):
+    content = "header\n1, Flabébé, 2\n".encode('utf-8')
+    # Every split point lands somewhere inside the line, including inside "é"
+    for block_size in range(1, len(content) + 1):
+        with write_and_open(tmp_path, content) as file:
+            assert read_last_line(file, block_size=block_size) == "1, Flabébé, 2"
+
+
+def test_read_last_line_leaves_text_stream_at_end(tmp_path):
+    with write_and_open(tmp_path, b"header\n1, Bulbasaur, 2\n") as file:
+        file.readline()
+        read_last_line(file)
+        assert file.read() == ""